@@ -1,13 +1,32 @@
 import subprocess
 import argparse
+import asyncio
 import sys
-from pathlib import Path
+from pathlib import Path, PurePath, PurePosixPath
 from zipfile import BadZipFile, ZipFile
 import os
+import platform
+import posixpath
+import threading
 import shutil
 from subprocess import STDOUT
 import time
-import pandas as pd
+import socket
+import json
+import hashlib
+import io
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+DOTNET_BUILD_COMMAND = ["dotnet", "build", "/nowarn:msb3246,msb3270", "/p:Platform=x64", "-v", "q"]
+BUILD_STAMP_NAME = '.build_stamp'
+GRPC_PORT = 7177
+CONSOLE_BIN = PurePath('BacktestConsole/bin/x64/Debug/net6.0')
+GRPC_SERVER_BIN = PurePath('GrpcBacktestServer/bin/x64/Debug/net6.0')
+GRPC_CLIENT_BIN = PurePath('GrpcEvaluation/bin/x64/Debug/net6.0')
+CONSOLE_EXE = 'BacktestConsole.exe'
+GRPC_SERVER_EXE = 'GrpcBacktestServer.exe'
+GRPC_CLIENT_EXE = 'GrpcEvaluation.exe'
 
 
 def get_csv_json_from_folder(folder):
@@ -16,14 +35,77 @@ def get_csv_json_from_folder(folder):
     '''
     csvs = []
     jsons = []
-    for filename in os.listdir(folder):
-        if filename.endswith('.csv'):
-            csvs.append(filename)
-        if filename.endswith('.json'):
-            jsons.append(filename)
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.endswith('.csv'):
+                csvs.append(entry.name)
+            elif entry.name.endswith('.json'):
+                jsons.append(entry.name)
+            else:
+                continue
+            # a folder with several csv or json files is rejected anyway: no need to scan further
+            if len(csvs) > 1 or len(jsons) > 1:
+                break
     return csvs, jsons
 
-def extract_build_solution(zipped_folder_path, destination_folder_name):
+def get_test_folders(test_prop_folder):
+    '''
+    Helper function for retrieving the test folders of a folder, using the entry types returned by the directory scan
+    '''
+    with os.scandir(test_prop_folder) as entries:
+        return [Path(entry.path) for entry in entries if entry.is_dir(follow_symlinks=False)]
+
+def get_tests(test_prop_folder):
+    '''
+    Helper function for retrieving the valid tests of a folder as (test folder, csv file, json file) triples.
+    Test folders that do not contain exactly one csv and one json file are reported and left out.
+    '''
+    tests = []
+    for test_folder in get_test_folders(test_prop_folder):
+        csvs, jsons = get_csv_json_from_folder(test_folder)
+        if len(csvs) != 1 or len(jsons) != 1:
+            print(f'wrong number of csv or json files in {test_folder}, skipping.')
+        else:
+            tests.append((test_folder, test_folder.joinpath(csvs[0]), test_folder.joinpath(jsons[0])))
+    return tests
+
+def extract_zip(zipped_folder_path, destination_folder_name):
+    '''
+    Helper function for extracting the members of a zipped folder in parallel, each thread reading the archive through its own handle.
+    '''
+    with ZipFile(zipped_folder_path, 'r') as zip_obj:
+        members = zip_obj.infolist()
+    destination_folder = Path(destination_folder_name)
+    # folders are created upfront so that threads do not race on their creation
+    for member in members:
+        parent = member.filename if member.is_dir() else posixpath.dirname(member.filename)
+        parts = [part for part in PurePosixPath(parent).parts if part not in ('/', '.', '..')]
+        if parts:
+            destination_folder.joinpath(*parts).mkdir(parents=True, exist_ok=True)
+    thread_data = threading.local()
+    handles = []
+    def extract_member(member):
+        if not hasattr(thread_data, 'zip_obj'):
+            archive = open(zipped_folder_path, 'rb', buffering=1 << 20)
+            thread_data.zip_obj = ZipFile(archive, 'r')
+            handles.append((thread_data.zip_obj, archive))
+        thread_data.zip_obj.extract(member, destination_folder)
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            list(executor.map(extract_member, [member for member in members if not member.is_dir()]))
+    finally:
+        for zip_obj, archive in handles:
+            zip_obj.close()
+            archive.close()
+
+def dotnet_environment():
+    '''
+    Helper function for building the environment of the dotnet builds: no telemetry nor first run banner.
+    Packages are restored into the default NuGet global packages folder, which is shared by all the builds.
+    '''
+    return {**os.environ, 'DOTNET_CLI_TELEMETRY_OPTOUT': '1', 'DOTNET_NOLOGO': '1'}
+
+def extract_build_solution(zipped_folder_path, destination_folder_name, child_output=None):
     '''
     Principle: give as an input a zipped folder containing the solution to compile, along with a destination folder where the solution will be extracted. 
     The script compiles the entire unzipped solution.
@@ -39,16 +121,14 @@ def extract_build_solution(zipped_folder_path, destination_folder_name):
             print('*** still proceeding')
             print('*********************************************************************')
         print(f"Unzipping zipped folder at {zipped_folder_path} into {destination_folder_name}")
-        with ZipFile(zipped_folder_path, 'r') as zip_obj:
-            zip_obj.extractall(destination_folder_name)
-            print('Done with extraction')
-        new_folder = Path(destination_folder_name).joinpath(unzipped_folder)
-        if not Path(new_folder).exists():
+        extract_zip(zipped_folder_path, destination_folder_name)
+        print('Done with extraction')
+        new_folder = destination_folder_name / unzipped_folder
+        if not new_folder.exists():
             print(f'Wrong extracted folder name, expected {new_folder.stem}')
             sys.exit(1)
-        os.chdir(new_folder)
         print(f'Building solution in folder {unzipped_folder} (platform x64)')
-        subprocess.run("dotnet build /nowarn:msb3246,msb3270 /p:Platform=x64 -v q", check=True)
+        subprocess.run(DOTNET_BUILD_COMMAND, check=True, cwd=new_folder, env=dotnet_environment(), stdout=child_output, stderr=child_output)
         print(f"Done building solution in folder {unzipped_folder}")
         return True, new_folder
     except BadZipFile:
@@ -64,140 +144,259 @@ def extract_build_solution(zipped_folder_path, destination_folder_name):
         print('Exiting...')
         return False, None
 
-def console_tests(console_folder, test_prop_folder, output_folder):
+async def console_tests(console_folder, tests, output_folder, child_output=None, resume_inputs=None, max_parallel_tests=None):
     '''
-    Execution of a set of tests from an application console
+    Execution of a set of tests from an application console, at most max_parallel_tests tests (one per cpu by default) running at the same time
+    The tests are (test folder, csv file, json file) triples, as returned by get_tests.
     '''
     try:
         print('Running tests on console')
-        Path.mkdir(output_folder, parents=True)
-        for test_folder in test_prop_folder.iterdir():
-            if test_folder.is_dir():
-                run_single_console_test(console_folder, test_folder, output_folder)
+        Path.mkdir(output_folder, parents=True, exist_ok=True)
+        semaphore = asyncio.Semaphore(max_parallel_tests or os.cpu_count() or 1)
+        backtest_exe = console_folder / CONSOLE_EXE
+        await asyncio.gather(*(run_single_console_test(backtest_exe, test_folder, csv_file, json_file, output_folder, semaphore, child_output, resume_inputs)
+                               for test_folder, csv_file, json_file in tests))
     except SystemExit:
         print('Exiting...')
 
-def run_single_console_test(solution_folder, test_folder, out_folder):
+async def run_single_console_test(backtest_exe, test_folder, csv_file, json_file, out_folder, semaphore, child_output=None, resume_inputs=None):
     '''
     Main method for running a console test on a given set of parameters and market data.
+    The semaphore bounds the number of backtests running concurrently.
+    When resume_inputs is given, a test whose output is newer than its csv and json files and than the resume inputs is not run again.
     '''
     print(f'Running test in folder {test_folder}')
-    os.chdir(solution_folder)  
-    csvs, jsons = get_csv_json_from_folder(test_folder)
-    if len(csvs) != 1 or len(jsons) != 1:
-        print(f'wrong number of csv or json files in {test_folder}, skipping.')
-    else:
-        csv_file = test_folder.joinpath(csvs[0])
-        json_file = test_folder.joinpath(jsons[0])
-        result_file = str(out_folder.joinpath(test_folder.name))
-        subprocess.run(f"BacktestConsole.exe {json_file} {csv_file} {result_file}_output.json", check=True)
+    result_file = str(out_folder.joinpath(test_folder.name))
+    if resume_inputs is not None and output_is_up_to_date(Path(f"{result_file}_output.json"), json_file, csv_file, *resume_inputs):
+        print(f'Output of test in folder {test_folder} is up to date, skipping.')
+        return
+    command = [str(backtest_exe), str(json_file), str(csv_file), f"{result_file}_output.json"]
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(*command, cwd=backtest_exe.parent, stdout=child_output, stderr=child_output)
+        return_code = await process.wait()
+    if return_code != 0:
+        raise subprocess.CalledProcessError(return_code, command)
 
-def grpc_console_tests(grpc_server_folder, test_prop_folder, output_folder, client_path):
+async def grpc_console_tests(grpc_server_folder, tests, output_folder, client_path, child_output=None, resume_inputs=None, max_parallel_tests=None):
     '''
-    Execution of a set of tests from a grpc server
+    Execution of a set of tests from a grpc server, the clients of at most max_parallel_tests tests (one per cpu by default) running at the same time
+    The tests are (test folder, csv file, json file) triples, as returned by get_tests.
     '''
+    print('Running grpc tests on console')
+    print('starting grpc folder')
+    server_exe = grpc_server_folder / GRPC_SERVER_EXE
+    # when its output is silenced, the server output is read to detect when it starts listening
+    watch_output = child_output == subprocess.DEVNULL
     try:
-        print('Running grpc tests on console')
-        os.chdir(grpc_server_folder)
-        print('starting grpc folder')
-        process= subprocess.Popen("GrpcBacktestServer.exe")
-        time.sleep(3)
-        for test_folder in test_prop_folder.iterdir():
-            if test_folder.is_dir():
-                run_single_grpc_test(test_folder, output_folder, client_path)
-        print('killing server')
-        process.kill()
+        process= subprocess.Popen([str(server_exe)], cwd=grpc_server_folder, stdout=subprocess.PIPE if watch_output else child_output, stderr=child_output)
+    except FileNotFoundError as e:
+        print(e)
+        print('Exiting...')
+        return
+    ready = threading.Event()
+    if watch_output:
+        threading.Thread(target=watch_server_output, args=(process, ready), daemon=True).start()
+    try:
+        if not wait_for_server(process, GRPC_PORT, ready):
+            print(f'grpc server not listening on port {GRPC_PORT}, skipping grpc tests')
+            return
+        semaphore = asyncio.Semaphore(max_parallel_tests or os.cpu_count() or 1)
+        client_exe = client_path / GRPC_CLIENT_EXE
+        await asyncio.gather(*(run_single_grpc_test(test_folder, csv_file, json_file, output_folder, client_exe, semaphore, child_output, resume_inputs)
+                               for test_folder, csv_file, json_file in tests))
     except SystemExit:
-        print('killing server on exception')
-        process.kill()
         print('Exiting...')
     except FileNotFoundError as e:
-        print('killing server on file not found exception')
+        print('file not found exception')
         print(e)
-        process.kill()
         print('Exiting...')
+    finally:
+        print('killing server')
+        process.kill()
+
+def watch_server_output(process, ready):
+    '''
+    Helper function for reading the output of a server until it exits, setting the ready event once the server reports it is listening.
+    '''
+    for line in process.stdout:
+        if b'Now listening on' in line:
+            ready.set()
+
+def wait_for_server(process, port, ready=None, timeout=30):
+    '''
+    Helper function for waiting until a server accepts connections on a localhost port, polling with an exponential backoff.
+    The wait between two polls is cut short when the ready event gets set.
+    Returns False if the server exits or does not listen on the port before the timeout.
+    '''
+    if ready is None:
+        ready = threading.Event()
+    delay = 0.05
+    deadline = time.monotonic() + timeout
+    while process.poll() is None and time.monotonic() < deadline:
+        try:
+            socket.create_connection(('localhost', port), timeout=delay).close()
+            return True
+        except OSError:
+            # once set, the event no longer blocks: fall back to sleeping so that a server listening elsewhere is not polled in a busy loop
+            if ready.is_set():
+                time.sleep(delay)
+            else:
+                ready.wait(delay)
+            delay = min(2 * delay, 1)
+    return False
 
-def run_single_grpc_test(test_folder, out_folder, client_path):
+async def run_single_grpc_test(test_folder, csv_file, json_file, out_folder, client_exe, semaphore, child_output=None, resume_inputs=None):
     '''
     Main method for running a grpc test on a given set of parameters and market data.
+    The semaphore bounds the number of clients running concurrently.
+    When resume_inputs is given, a test whose output is newer than its csv and json files and than the resume inputs is not run again.
     '''
     print(f'Running grpc test in folder {test_folder}')
-    csvs, jsons = get_csv_json_from_folder(test_folder)
-    if len(csvs) != 1 or len(jsons) != 1:
-        print(f'wrong number of csv or json files in {test_folder}, skipping.')
+    result_file = str(out_folder.joinpath(test_folder.name))
+    if resume_inputs is not None and output_is_up_to_date(Path(f"{result_file}_grpc_output.json"), json_file, csv_file, *resume_inputs):
+        print(f'Output of grpc test in folder {test_folder} is up to date, skipping.')
+        return
+    command = [str(client_exe), str(json_file), str(csv_file), f"{result_file}_grpc_output.json"]
+    async with semaphore:
+        process = await asyncio.create_subprocess_exec(*command, cwd=client_exe.parent, stdout=child_output, stderr=STDOUT)
+        await process.wait()
+    print('done with grpc test')
+
+def output_is_up_to_date(output_file, *input_files):
+    '''
+    Helper function for checking whether a test output exists, is not empty and is more recent than the test inputs.
+    '''
+    try:
+        output_stat = output_file.stat()
+    except FileNotFoundError:
+        return False
+    return output_stat.st_size > 0 and all(output_stat.st_mtime > input_file.stat().st_mtime for input_file in input_files)
+
+def fast_rmtree(folder_path):
+    '''
+    Helper function for removing a folder and its content, delegating to rm outside of Windows.
+    Fails if the folder cannot be entirely removed (e.g. a file is locked), so that stale files are never mixed with new ones.
+    '''
+    if platform.system() != 'Windows':
+        subprocess.run(["rm", "-rf", "--", str(folder_path)], check=True)
     else:
-        csv_file = test_folder.joinpath(csvs[0])
-        json_file = test_folder.joinpath(jsons[0])
-        result_file = str(out_folder.joinpath(test_folder.name))
-        os.chdir(client_path)
-        proc_2 = subprocess.Popen(["GrpcEvaluation.exe", json_file, csv_file, f"{result_file}_grpc_output.json"], stderr=STDOUT)
-        proc_2.communicate()
-        print('killing client')
-        proc_2.kill()
-        print('done with grpc test')
-
-def create_grpc_client_path(grpc_folder_path):
+        shutil.rmtree(folder_path)
+
+def link_or_copy(source, destination):
+    '''
+    Helper function for hardlinking a file, falling back to a copy when the link cannot be created (e.g. across devices).
+    '''
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy2(source, destination)
+    return destination
+
+def source_stamp(source_folder):
+    '''
+    Helper function for computing a hash of the files (path, size and modification time) of a source folder.
+    '''
+    digest = hashlib.sha256()
+    for root, folders, files in os.walk(source_folder):
+        folders[:] = sorted(folder for folder in folders if folder not in ('bin', 'obj'))
+        for filename in sorted(files):
+            file_path = os.path.join(root, filename)
+            stat = os.stat(file_path)
+            digest.update(f'{os.path.relpath(file_path, source_folder)}:{stat.st_size}:{stat.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
+
+def create_grpc_client_path(grpc_folder_path, child_output=None):
     '''
     Helper method for building the grpc and accessing the executable path.
     '''
     client_source_path = Path.cwd().joinpath('GrpcEvaluation')
-    if  Path(grpc_folder_path).exists():
-        shutil.rmtree(grpc_folder_path)
-    shutil.copytree(client_source_path, grpc_folder_path)
-    os.chdir(grpc_folder_path)
+    grpc_client_path=grpc_folder_path / GRPC_CLIENT_BIN
+    build_stamp = source_stamp(client_source_path)
+    stamp_file = grpc_folder_path.joinpath(BUILD_STAMP_NAME)
+    # the stamp alone is not enough: the build output may have been cleaned since
+    if stamp_file.exists() and stamp_file.read_text() == build_stamp and grpc_client_path.joinpath(GRPC_CLIENT_EXE).exists():
+        print(f'Client in folder {grpc_folder_path} is up to date, skipping build')
+        return grpc_client_path
+    if grpc_folder_path.exists():
+        fast_rmtree(grpc_folder_path)
+    # build outputs are not linked: msbuild could rewrite them in place and alter the sources
+    shutil.copytree(client_source_path, grpc_folder_path, copy_function=link_or_copy, ignore=shutil.ignore_patterns('bin', 'obj'))
     print(f'Building client in folder {grpc_folder_path} (platform x64)')
-    subprocess.run("dotnet build /nowarn:msb3246,msb3270 /p:Platform=x64 -v q", check=True)
+    subprocess.run(DOTNET_BUILD_COMMAND, check=True, cwd=grpc_folder_path, env=dotnet_environment(), stdout=child_output, stderr=child_output)
     print(f"Done building client in folder {grpc_folder_path}")
-    grpc_client_path=grpc_folder_path.joinpath('GrpcEvaluation/bin/x64/Debug/net6.0')
+    stamp_file.write_text(build_stamp)
     return grpc_client_path  
 
 def check_output_structure(output_folder):
     '''
     Helper method to make sure the application outputs are in the correct format.
     '''
-    EXPECTED_FIELDS = ['date', 'value', 'deltas', 'deltasStdDev', 'price', 'priceStdDev']
+    EXPECTED_FIELDS = frozenset(['date', 'value', 'deltas', 'deltasStdDev', 'price', 'priceStdDev'])
     for result_file in output_folder.iterdir():
         print(f'  File {result_file}')
         try:
-            df = pd.read_json(result_file)
-            columns = df.columns
-            for field in EXPECTED_FIELDS:
-                if field not in columns:
-                    print(f'** Warning: missing field {field}. Make sure the field names are camelcased.')
+            with open(result_file, encoding='utf-8-sig') as f:
+                data = json.load(f)
+            if isinstance(data, list):
+                record = data[0] if data and isinstance(data[0], dict) else {}
+            elif isinstance(data, dict):
+                record = data
+            else:
+                raise ValueError(f'unexpected json content in {result_file}')
+            missing = EXPECTED_FIELDS - record.keys()
+            for field in sorted(missing):
+                print(f'** Warning: missing field {field}. Make sure the field names are camelcased.')
             print('  --> OK')
         except ValueError:
             print('Unable to parse json file.')
 
-def create_output_for_project(zipped_project_path, tests_folder_path, build_folder_path, out_folder_path, grpc_client_path):
+def create_output_for_project(zipped_project_path, tests, build_folder_path, out_folder_path, grpc_client_path, child_output=None, resume=False, max_parallel_tests=None):
     '''
     Parameters:
     - zipped_project_path: path to the zipped project for which the output will be created
-    - test_folder_path: path to the folder containing the tests to be run
+    - tests: tests to be run, as (test folder, csv file, json file) triples returned by get_tests
     - build_folder_path: path to the folder where the project will be extracted and built
     - out_folder_path: path to the folder where the output results will be stored
     - grpc_client_path: path to the folder containing the grpc client (if it exists), None otherwise
+    - child_output: where the output of the dotnet processes goes (subprocess.DEVNULL to silence them), None to inherit the script output
+    - resume: whether the tests whose output is more recent than the test files and the zipped project are skipped
+    - max_parallel_tests: maximum number of tests of the project running at the same time, one per cpu if None
     '''    
-    build_ok, solution_folder = extract_build_solution(zipped_project_path, build_folder_path)
+    # a resubmitted zipped project makes all its previous outputs out of date
+    resume_inputs = (zipped_project_path,) if resume else None
+    build_ok, solution_folder = extract_build_solution(zipped_project_path, build_folder_path, child_output)
     if build_ok:
-        solution_folder_path = Path(solution_folder)
-        solution_name = solution_folder_path.name
-        console_bin_path = 'BacktestConsole/bin/x64/Debug/net6.0'
-        console_folder = solution_folder_path.joinpath(console_bin_path)
-        if not Path(console_folder).exists():
+        solution_name = solution_folder.name
+        console_folder = solution_folder / CONSOLE_BIN
+        if not console_folder.exists():
             print(f'Wrong path {console_folder}')
             sys.exit(1)
-        output_folder = out_folder_path.joinpath(solution_name).joinpath('output')
-        console_tests(console_folder, tests_folder_path, output_folder)
+        output_folder = out_folder_path / solution_name / 'output'
+        asyncio.run(console_tests(console_folder, tests, output_folder, child_output, resume_inputs, max_parallel_tests))
         if not (grpc_client_path is None):
-            grpc_path = Path(solution_folder).joinpath('GrpcBacktestServer')
+            grpc_path = solution_folder / 'GrpcBacktestServer'
             if grpc_path.exists():
                 print('Grpc server exists, running tests')
-                server_bin_path = 'GrpcBacktestServer/bin/x64/Debug/net6.0'
-                grpc_folder = solution_folder_path.joinpath(server_bin_path)
-                grpc_console_tests(grpc_folder, tests_folder_path, output_folder, grpc_client_path)
+                grpc_folder = solution_folder / GRPC_SERVER_BIN
+                asyncio.run(grpc_console_tests(grpc_folder, tests, output_folder, grpc_client_path, child_output, resume_inputs, max_parallel_tests))
         print('Checking output structure')
         check_output_structure(output_folder)
 
+def create_logged_output_for_project(*args):
+    '''
+    Runs create_output_for_project in a worker process, buffering what it prints so that the logs of projects running in parallel do not interleave.
+    Returns the log along with the exception raised by the project, if any.
+    When the output of the dotnet processes is not silenced, it still goes directly to the console.
+    '''
+    log = io.StringIO()
+    error = None
+    with contextlib.redirect_stdout(log):
+        try:
+            create_output_for_project(*args)
+        except BaseException as e:
+            error = e
+    return log.getvalue(), error
+
 def run_tests():
     '''
     Main orchestrator for tests
@@ -209,6 +408,8 @@ def run_tests():
     parser.add_argument("--out", help="Path to folder where the results will be stored")
     parser.add_argument("--grpc", help="Optional. Path to folder where the grpc client will be stored")
     parser.add_argument("--force", action='store_true', help="Force output folder to be erased if it already exists. Default: false")
+    parser.add_argument("--resume", action='store_true', help="Reuse an existing output folder, skipping the tests whose output is more recent than the test files and the zipped solution. Default: false")
+    parser.add_argument("--verbose", action='store_true', help="Show the output of the dotnet builds, backtests and grpc processes. Default: false")
     args = parser.parse_args()
     if not args.sln:
         print('Missing "--sln" parameter')
@@ -223,25 +424,52 @@ def run_tests():
         print('Missing "--out" parameter')
         sys.exit(1)
     else:
+        # paths are resolved once so that child processes started in other folders can use them
+        try:
+            zipped_folder_path = Path(args.sln).resolve(strict=True)
+            tests_folder_path = Path(args.tests).resolve(strict=True)
+        except FileNotFoundError as e:
+            print(f'Error: no such folder {e.filename}')
+            sys.exit(1)
+        build_folder_path = Path(args.build).resolve()
+        child_output = None if args.verbose else subprocess.DEVNULL
+        out_folder_path = Path(args.out).resolve()
         if not args.grpc:
             grpc_client_path=None
         else:
-            grpc_folder_path = Path(args.grpc)
-            grpc_client_path = create_grpc_client_path(grpc_folder_path)
-        zipped_folder_path = Path(args.sln)
-        tests_folder_path = Path(args.tests)
-        build_folder_path = Path(args.build)
-        out_folder_path = Path(args.out)        
-        if  Path(out_folder_path).exists():
+            grpc_folder_path = Path(args.grpc).resolve()
+            grpc_client_path = create_grpc_client_path(grpc_folder_path, child_output)
+        if out_folder_path.exists():
             if args.force:
-                shutil.rmtree(out_folder_path)
+                fast_rmtree(out_folder_path)
+            elif args.resume:
+                print('Output folder already exists, resuming')
             else:
                 print('Error: output folder already exists')
                 sys.exit(1)
-        Path.mkdir(out_folder_path)
-        for filename in zipped_folder_path.iterdir():
-            if filename.suffix == '.zip':
-                create_output_for_project(zipped_folder_path.joinpath(filename), tests_folder_path, build_folder_path, out_folder_path, grpc_client_path) 
+        Path.mkdir(out_folder_path, exist_ok=True)
+        tests = get_tests(tests_folder_path)
+        zipped_projects = list(zipped_folder_path.glob('*.zip'))
+        # grpc servers of different projects listen on the same port: run projects one at a time in that case
+        cpu_count = os.cpu_count() or 1
+        max_workers = 1 if grpc_client_path is not None else max(1, min(cpu_count, len(zipped_projects)))
+        # the cpus are shared between the projects running at the same time, so that at most one test per cpu runs overall
+        max_parallel_tests = max(1, cpu_count // max_workers)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(create_logged_output_for_project, zipped_project, tests, build_folder_path, out_folder_path, grpc_client_path, child_output, args.resume, max_parallel_tests): zipped_project
+                       for zipped_project in zipped_projects}
+            # a failing project does not stop the others: all the logs are printed before exiting with an error
+            failed_projects = []
+            for future in as_completed(futures):
+                log, error = future.result()
+                print(f'===== {futures[future].stem} =====')
+                print(log, end='')
+                if error is not None:
+                    print(f'** Error in project {futures[future].stem}: {error!r}')
+                    failed_projects.append(futures[future].stem)
+        if failed_projects:
+            print(f'Error: failed projects: {", ".join(sorted(failed_projects))}')
+            sys.exit(1)
 
      
 